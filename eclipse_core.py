@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+
+import asyncio
+import bisect
+import collections
+import datetime
+import functools
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import tqdm
+import sys
+import math
+from dataclasses import dataclass, field
+from enum import Enum
+
+try:
+    # Optional: the python-gphoto2 libgphoto2 bindings keep every camera
+    # operation in-process (no child process, no config-tree reparse)
+    import gphoto2
+except ImportError:
+    gphoto2 = None
+
+"""
+Shared engine for gphoto2-driven eclipse capture scripts
+
+Everything that is not specific to one observing site or camera rig lives
+here: the persistent gphoto2 shell, the Phase settings container, the capture
+functions, and the asyncio timeline in main(). A site script (such as
+solar_eclipse.py) defines its contact timings and exposure tables and hands
+them to main(); keeping one copy of the engine avoids the maintenance drift
+(and double bytecode) of near-identical top-level scripts.
+
+NO WARRANTY ON THIS CODE. IT HAS NEVER BEEN TESTED. USE AT YOUR OWN RISK.
+"""
+
+class Config:
+    Bracketing ='/main/capturesettings/aeb'
+    Aperture = '/main/capturesettings/aperture'
+    ShutterSpeed = '/main/capturesettings/shutterspeed'
+    EV = '/main/capturesettings/exposurecompensation'
+    ISO = '/main/imgsettings/iso'
+
+class Bracketing(Enum):
+    # Obtained through `gphoto2 --get-config "/main/capturesettings/aeb"`
+    OFF = 0
+    EV_0_1_3 = 1
+    EV_0_2_3 = 2
+    EV_1 = 3
+    EV_1_1_3 = 4
+    EV_1_2_3 = 5
+    EV_2 = 6
+
+# Terminal and speech output is serviced by a worker thread (see _ui_worker in
+# main); a stalled pty or a full Festival pipe must never block the event-loop
+# thread that is timing captures
+UI_QUEUE = queue.Queue()
+
+def echo(text: str):
+    """Queue text for the terminal without blocking the capture path"""
+    UI_QUEUE.put_nowait(('print', text))
+
+@functools.lru_cache(maxsize=64)
+def _festival_command(text: str) -> bytes:
+    """Festival SayText command for text, formatted and encoded once per
+    distinct string (announcements repeat across phases and retries)"""
+    return f'(SayText "{text}")\n'.encode()
+
+
+class GPhotoShell:
+    """
+    Persistent `gphoto2 --shell` session shared by all captures
+
+    Spawning a fresh gphoto2 process for every exposure pays fork/exec plus
+    libgphoto2 USB re-enumeration and PTP session setup (hundreds of
+    milliseconds) on every shot, which directly caps the frame rate during the
+    Diamond Ring and Bailey's Beads windows. Keeping one shell alive for the
+    whole eclipse amortizes that setup cost across every capture.
+
+    Images are downloaded into the shell's local working directory (see
+    chdir), named by the --filename template passed at launch. Config writes
+    are cached Python-side so repeating the same aperture/speed/ISO between
+    consecutive shots costs no USB round-trip.
+    """
+
+    PROMPT = b'gphoto2:'
+
+    def __init__(self):
+        self.proc = None
+        self.state = {} # Last value written to each config path
+        self.cwd = None # Local directory the shell downloads into
+        self.lock = None # Serializes shell commands across tasks
+
+    async def start(self):
+        # Cached device state is only valid for the session that wrote it
+        self.state = {}
+        self.cwd = None
+        self.lock = asyncio.Lock()
+        self.proc = await asyncio.create_subprocess_exec(
+            'gphoto2', '--shell', '--force-overwrite', '--no-keep',
+            '--filename', '%Y%m%dT%H%M%S_%n.%C',
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+        await self._wait_prompt()
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def _wait_prompt(self):
+        """Consume the shell's stdout until its prompt reappears"""
+        while True:
+            try:
+                await self.proc.stdout.readuntil(self.PROMPT)
+                return
+            except asyncio.IncompleteReadError:
+                raise RuntimeError('gphoto2 shell exited unexpectedly')
+            except asyncio.LimitOverrunError as e:
+                # Chatty output (download progress); discard and keep looking
+                await self.proc.stdout.readexactly(e.consumed)
+
+    async def run(self, *commands: str):
+        """Send commands down the shell's stdin and wait for them to finish
+
+        A multi-command batch is written up front in a single pipe write, so
+        the shell starts each follow-on command the moment the previous one
+        completes instead of round-tripping through us in between.
+        """
+        async with self.lock:
+            for command in commands:
+                echo(f'gphoto2: {command}')
+            self.proc.stdin.write(b''.join(c.encode() + b'\n' for c in commands))
+            await self.proc.stdin.drain()
+            for _ in commands:
+                await self._wait_prompt()
+
+    async def set_config(self, path: str, value):
+        """Write a config value, skipping the PTP round-trip if it is unchanged
+
+        Uses set-config, which accepts a choice index as well as a literal
+        value, so index-valued radio/menu widgets (aeb, capturetarget) work.
+        """
+        value = str(value)
+        if self.state.get(path) == value:
+            return
+        await self.run(f'set-config {path}={value}')
+        self.state[path] = value
+
+    async def apply(self, settings):
+        """Apply precomposed (path, value, command) config writes
+
+        Writes the cache does not already hold go out as one batch; in steady
+        state (same settings as the previous shot) this is a pure no-op.
+        """
+        pending = [entry for entry in settings if self.state.get(entry[0]) != entry[1]]
+        if pending:
+            await self.run(*(command for _, _, command in pending))
+            for path, value, _ in pending:
+                self.state[path] = value
+
+    async def chdir(self, directory: str):
+        """Point the shell's local working directory at `directory`"""
+        if self.cwd == directory:
+            return
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        await self.run(f'lcd {os.path.abspath(directory)}')
+        self.cwd = directory
+
+    async def capture(self, count: int = 1):
+        """Capture and download `count` frames as one batched command"""
+        await self.run(*('capture-image-and-download',) * count)
+
+
+class LibGPhotoCamera:
+    """
+    In-process libgphoto2 backend, used when python-gphoto2 is installed
+
+    Presents the same interface as GPhotoShell, but speaks the C API
+    directly: the camera is opened and its config tree loaded once at
+    startup, so every subsequent set or capture is a bare USB PTP
+    transaction with no child process and no config reparse. The blocking C
+    calls run in the default executor so the event loop's timers stay
+    honest.
+    """
+
+    def __init__(self):
+        self.cam = None
+        self.config = None # Config tree, fetched once and mutated in place
+        self.state = {} # Last value written to each config path
+        self.cwd = None # Directory captures are saved into
+        self.lock = None
+        self.loop = None
+
+    @property
+    def alive(self) -> bool:
+        return self.cam is not None
+
+    async def start(self):
+        self.cam = None
+        self.state = {}
+        self.cwd = None
+        self.lock = asyncio.Lock()
+        self.loop = asyncio.get_running_loop()
+
+        def init():
+            cam = gphoto2.Camera()
+            cam.init()
+            self.config = cam.get_config()
+            self.cam = cam # Only counts as alive once fully initialized
+        await self.loop.run_in_executor(None, init)
+
+    async def _call(self, fn):
+        async with self.lock:
+            try:
+                return await self.loop.run_in_executor(None, fn)
+            except gphoto2.GPhoto2Error as e:
+                if e.code in (gphoto2.GP_ERROR_IO,
+                              gphoto2.GP_ERROR_IO_USB_FIND,
+                              gphoto2.GP_ERROR_IO_USB_CLAIM,
+                              gphoto2.GP_ERROR_CAMERA_ERROR,
+                              gphoto2.GP_ERROR_MODEL_NOT_FOUND):
+                    # The device is gone or wedged, not just one bad write;
+                    # mark the backend dead so camera() reopens it
+                    self.cam = None
+                raise
+
+    def _write(self, pending):
+        """Blocking: push (path, value, _) entries into the cached widget tree"""
+        for path, value, _ in pending:
+            widget = self.config.get_child_by_name(path.rsplit('/', 1)[-1])
+            if widget.get_type() in (gphoto2.GP_WIDGET_RADIO, gphoto2.GP_WIDGET_MENU) \
+                    and value not in widget.get_choices():
+                value = widget.get_choice(int(value)) # Numeric choice index (e.g. aeb)
+            widget.set_value(value)
+        self.cam.set_config(self.config)
+
+    def _shoot(self, count: int):
+        """Blocking: capture count frames and save them into cwd"""
+        for _ in range(count):
+            path = self.cam.capture(gphoto2.GP_CAPTURE_IMAGE)
+            self.cam.file_get(path.folder, path.name, gphoto2.GP_FILE_TYPE_NORMAL) \
+                .save(os.path.join(self.cwd or '.', path.name))
+
+    async def apply(self, settings):
+        pending = [entry for entry in settings if self.state.get(entry[0]) != entry[1]]
+        if pending:
+            await self._call(lambda: self._write(pending))
+            for path, value, _ in pending:
+                self.state[path] = value
+
+    async def chdir(self, directory: str):
+        if self.cwd != directory:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            self.cwd = directory
+
+    async def capture(self, count: int = 1):
+        await self._call(lambda: self._shoot(count))
+
+
+async def camera():
+    """Lazily open the shared camera backend on first use
+
+    The in-process libgphoto2 bindings are preferred when installed; the
+    persistent gphoto2 shell is the fallback. If the backend has died
+    (camera unplugged/replugged, libgphoto2 crash), it is reopened here so
+    the next capture recovers instead of failing for the rest of the
+    eclipse.
+    """
+    try:
+        shell = camera.shell
+    except AttributeError:
+        shell = camera.shell = GPhotoShell() if gphoto2 is None else LibGPhotoCamera()
+        await shell.start()
+    else:
+        if not shell.alive:
+            echo('camera session died; reopening it')
+            await shell.start()
+    return camera.shell
+
+def parse_speed(speed: str) -> float:
+    """Exposure time in seconds of a shutter speed string like '1/3200' or '0.5'"""
+    num, _, den = speed.partition('/')
+    return float(num) / float(den) if den else float(num)
+
+def broadcast(option, n: int):
+    """Normalize a scalar-or-list setting into a tuple of length n"""
+    if not isinstance(option, (list, tuple)):
+        return (option,) * n
+    return tuple(option[i % len(option)] for i in range(n))
+
+@dataclass(slots=True)
+class Phase:
+    """
+    Exposure program for one phase of the eclipse
+
+    interval: Used for partial and total phases, specifies the approximate maximum interval between exposure sets; ignored in Bailey's Beads/Diamond Ring phases
+    index: Internal counter to cycle between exposure settings for a given phase
+    bracketing: Bracketing setting to use for this phase
+    aperture: Union[List[str], str], specifying the aperture(s) to use for the exposures. Lists are cycled through.
+    speed: Union[List[str], str], specifying the shutter speed(s) to use for the exposures. Lists are cycled through.
+    iso: Union[List[int], int], specifying the ISO(s) to use for the exposures. Lists are cycled through.
+    announcement: Spoken when the phase becomes active
+
+    Settings are normalized into parallel tuples of equal length N (with
+    matching precomputed exposure values) as soon as the instance is built.
+    The download directory is assigned by main() from the site's target
+    directory.
+
+    Run gphoto2 --get-config /main/capturesettings/aperture to get aperture
+    options, and similarly for shutterspeed.
+    """
+    name: str
+    announcement: str
+    bracketing: Bracketing = Bracketing.OFF
+    aperture: "str | list | tuple" = "4.5"
+    speed: "str | list | tuple" = "1/8000"
+    iso: "int | list | tuple" = 200
+    interval: int = 0
+    index: int = 0 # Tracks which setting is to be used
+    N: int = field(init=False, default=1)
+    EV: tuple = field(init=False, default=())
+    directory: str = field(init=False, default='')
+    settings: tuple = field(init=False, default=())
+
+    def __post_init__(self):
+        self.N = max(len(option) if isinstance(option, (list, tuple)) else 1
+                     for option in (self.aperture, self.iso, self.speed))
+        self.aperture = broadcast(self.aperture, self.N)
+        self.speed = broadcast(self.speed, self.N)
+        self.iso = broadcast(self.iso, self.N)
+        self.EV = tuple(math.log2(iso * parse_speed(sp) / float(ap)**2)
+                        for ap, sp, iso in zip(self.aperture, self.speed, self.iso))
+        # Every shell command this phase will ever send is composed here,
+        # once; the capture path just replays precomposed strings
+        self.settings = tuple(
+            (
+                (Config.Aperture, ap, f'set-config-value {Config.Aperture}={ap}'),
+                (Config.ShutterSpeed, sp, f'set-config-value {Config.ShutterSpeed}={sp}'),
+                (Config.ISO, str(iso), f'set-config-value {Config.ISO}={iso}'),
+                # Bracketing and capturetarget are numeric choice indices:
+                # only set-config resolves those, set-config-value would pass
+                # the literal string to the driver and be rejected
+                (Config.Bracketing, str(self.bracketing.value),
+                 f'set-config {Config.Bracketing}={self.bracketing.value}'),
+                ('capturetarget', '0', 'set-config capturetarget=0'),
+            )
+            for ap, sp, iso in zip(self.aperture, self.speed, self.iso))
+
+
+async def click_(phase: Phase, i: int):
+    """
+    Note: I found that there are issues of the camera going into busy mode and having PTP transactions fail in trying to do anything else, such as:
+        1. Using --trigger-capture to rapidly shoot burst frames
+        2. Storing files on CF card memory
+
+    This is slow and does not get the best coverage possible for diamond ring
+    and Bailey's Beads, but it is better than the script failing due to some
+    PTP error and not taking any pictures at all.
+
+    All captures go through the persistent gphoto2 shell (see GPhotoShell),
+    which avoids paying process startup and PTP session setup per shot; each
+    phase's images land in their own subdirectory of the target directory.
+    The commands for exposure slot i were precomposed when the Phase was
+    built, so nothing is formatted here.
+    """
+    echo(f'Exposure Value: {phase.EV[i]:0.2f}')
+    gp = await camera()
+    await gp.chdir(phase.directory)
+    await gp.apply(phase.settings[i])
+    count = 3 if phase.bracketing != Bracketing.OFF else 1
+    # One batched capture-image-and-download per click: every command
+    # serializes on the same shell pipe, so handing downloads to a separate
+    # task cannot actually overlap anything and would only add fixed
+    # wait-event stalls to the capture path
+    await gp.capture(count)
+
+async def click(phase: Phase):
+    """Note: The cycling mechanism is designed to abandon the cycle
+    whenever time runs out on the phase. For phases other than
+    totality, we resume from where we stopped in C1/C2 during
+    C3/C4."""
+    await click_(phase, phase.index % phase.N)
+    phase.index += 1
+
+
+async def main(date, timings_utc, partial, diamond, baileys, totality,
+               target_dir='Eclipse', diamond_ring=30, baileys_beads=10):
+    """
+    Run the whole eclipse sequence
+
+    date: (year, month, day) of the eclipse in UTC
+    timings_utc: list of four (H, M, S) contact times in UTC
+    partial, diamond, baileys, totality: the site's Phase instances
+    target_dir: directory where eclipse images will be saved
+    diamond_ring, baileys_beads: half-widths in seconds of the Diamond Ring
+        and Bailey's Beads windows around C2/C3
+    """
+
+    # All terminal and speech output funnels through this daemon thread;
+    # announcements at phase boundaries must never delay the first capture of
+    # a window, and a lagged ssh session or framebuffer console must never
+    # stall the event loop driving the camera
+    def _ui_worker():
+        try:
+            festival_proc = subprocess.Popen(['festival', '--pipe'], stdin=subprocess.PIPE) # Thank you ChatGPT
+        except OSError as e:
+            # Degrade to print-only announcements rather than losing all
+            # output for the run
+            festival_proc = None
+            print(f'!!!! festival unavailable ({e}); announcements will only be printed !!!!')
+        while True:
+            kind, payload = UI_QUEUE.get()
+            try:
+                if kind == 'refresh':
+                    payload.refresh()
+                elif kind == 'close':
+                    payload.close()
+                else:
+                    print(payload)
+                    if kind == 'say' and festival_proc is not None:
+                        try:
+                            festival_proc.stdin.write(_festival_command(payload))
+                            festival_proc.stdin.flush()
+                        except OSError as e:
+                            festival_proc = None
+                            print(f'!!!! festival died ({e}); announcements will only be printed !!!!')
+            finally:
+                # Every item is accounted for so flush_ui() can block on
+                # join() until queued output has actually been delivered
+                UI_QUEUE.task_done()
+
+    threading.Thread(target=_ui_worker, daemon=True).start()
+
+    def say(text: str):
+        UI_QUEUE.put_nowait(('say', text))
+
+    def flush_ui():
+        """Wait until everything queued so far has been printed/spoken
+
+        The worker is a daemon thread, so exit paths must drain the queue
+        explicitly or the operator's last (often most important) message
+        races process teardown and can be lost.
+        """
+        UI_QUEUE.join()
+
+    if not os.path.isdir(f'{target_dir}'):
+        os.makedirs(f'{target_dir}')
+
+    for phase in (partial, diamond, baileys, totality):
+        phase.directory = os.path.join(target_dir, phase.name)
+
+    TIMES = [datetime.datetime(*date, *t, 0, datetime.timezone.utc) for t in timings_utc]
+    C1 = TIMES[0]
+
+    today = datetime.datetime.utcnow().date()
+    if C1.date() != today:
+        print(f'!!!! Warning: Eclipse does not seem to be today, i.e. {today} !!!!')
+        say("Warning, eclipse does not seem to be today! Please check!")
+
+    # Both pre-flight checks come from one gphoto2 session, instead of two
+    # shell pipelines that each re-enumerate USB and re-open the camera
+    probe = subprocess.run(
+        ['gphoto2', '--get-config', '/main/capturesettings/focusmode',
+         '--get-config', '/main/capturesettings/drivemode'],
+        capture_output=True, text=True)
+
+    if not re.search(r'Current: Manual', probe.stdout):
+        say("Camera seems to be in auto-focus. Please manually focus. Goodbye!")
+        flush_ui()
+        sys.exit(1)
+
+    if not re.search(r'Current: Single', probe.stdout):
+        say("Camera not in single shot drive. Please check that this is intended!")
+
+    say("Please check that the camera is in manual mode")
+
+    say("Please check the times of the contacts printed")
+    for i, t in enumerate(TIMES):
+        print(f'{i+1}th contact at {t.ctime()} UTC in {(t.timestamp() - time.time())/60.0:0.2f} minutes')
+
+    say('Entering sequence loop')
+
+    # All scheduling below works on bare POSIX timestamps; timezone-aware
+    # datetimes are only kept for the human-readable printout above.
+    # time.time() returns a float straight from the kernel with no object
+    # allocation, unlike datetime.now(tz=utc) on every check.
+    C1_ts, C2_ts, C3_ts, C4_ts = (t.timestamp() for t in TIMES)
+    C2_DR_ts = C2_ts - diamond_ring
+    C2_BB_ts = C2_ts - baileys_beads
+    C2_BB2_ts = C2_ts + baileys_beads
+    C3_DR_ts = C3_ts + diamond_ring
+    C3_BB_ts = C3_ts + baileys_beads
+    C3_BB2_ts = C3_ts - baileys_beads
+
+    if time.time() > C4_ts:
+        say("It is after fourth contact. Nothing to do. Goodbye!")
+        flush_ui()
+        time.sleep(10)
+        return
+
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Event()
+    phase_changed = asyncio.Event()
+    current = None # Currently active phase; None while resting before C1/after C4
+
+    def set_phase(phase):
+        nonlocal current
+        if phase is current:
+            return
+        current = phase
+        say('Camera entering resting phase' if phase is None else phase.announcement)
+        phase_changed.set()
+
+    def end_of_eclipse():
+        nonlocal current
+        current = None
+        say('Fourth contact over. Exiting program')
+        phase_changed.set()
+        finished.set()
+
+    def call_at_ts(ts: float, callback, *args):
+        """Schedule callback at an absolute POSIX timestamp
+
+        loop.call_at runs on the monotonic clock, so the wall-to-monotonic
+        offset is re-measured on a short final hop before firing; an NTP step
+        during a long wait then cannot shift a contact boundary, and the
+        callback lands within the loop's timer resolution of the true instant.
+        """
+        def hop():
+            delay = ts - time.time()
+            if delay > 0.5:
+                loop.call_at(loop.time() + delay - 0.25, hop)
+            elif delay > 0:
+                loop.call_at(loop.time() + delay, callback, *args)
+            else:
+                callback(*args)
+        hop()
+
+    # Flat, pre-sorted schedule of phase boundaries as bare POSIX timestamps:
+    # no per-check datetime allocations, and the phase active at any instant
+    # is a single bisect away
+    boundaries = (
+        (C1_ts, partial),
+        (C2_DR_ts, diamond),
+        (C2_BB_ts, baileys),
+        (C2_BB2_ts, totality),
+        (C3_BB2_ts, baileys),
+        (C3_BB_ts, diamond),
+        (C3_DR_ts, partial),
+        (C4_ts, None),
+    )
+    boundary_ts = [ts for ts, _ in boundaries]
+    boundary_phase = [phase for _, phase in boundaries]
+
+    def phase_at(t: float):
+        """Phase active at POSIX time t, or None while resting"""
+        i = bisect.bisect_right(boundary_ts, t) - 1
+        return boundary_phase[i] if i >= 0 else None
+
+    # Interval-paced phases fire on a grid of absolute timestamps anchored
+    # at each window's opening contact, precomputed here; cycles that
+    # overrun simply abandon the slots they missed, so the cadence never
+    # drifts with capture time
+    grids = {}
+    for (start, phase), end in zip(boundaries, boundary_ts[1:]):
+        if phase is not None and phase.interval:
+            grids.setdefault(phase, collections.deque()).extend(
+                start + k * phase.interval
+                for k in range(math.ceil((end - start) / phase.interval)))
+
+    # One-shot timers flip the active phase exactly at each contact boundary,
+    # instead of the old polling loop that could be up to 500 ms late
+    for ts, phase in boundaries[:-1]:
+        if ts > time.time():
+            call_at_ts(ts, set_phase, phase)
+    call_at_ts(boundary_ts[-1], end_of_eclipse)
+
+    async def capture_loop():
+        """Shoot whatever the active phase calls for; captures never block
+        the timers or the announcement/progress tasks."""
+        while not finished.is_set():
+            phase = current
+            if phase is None:
+                phase_changed.clear()
+                await phase_changed.wait()
+                continue
+            try:
+                if phase.interval:
+                    # Interval-paced phases shoot one exposure set per grid
+                    # slot (see grids above), one click at a time so a phase
+                    # boundary can abandon the cycle between exposures — a
+                    # totality cycle is many seconds long and must not run
+                    # into the C3 Bailey's Beads window
+                    echo(f'Clicking {phase.name} exposure set')
+                    for _ in range(phase.N):
+                        if current is not phase:
+                            break
+                        await click(phase)
+                    grid = grids[phase]
+                    while grid and grid[0] <= time.time():
+                        grid.popleft() # Slots that passed while shooting are abandoned
+                    if current is phase:
+                        phase_changed.clear()
+                        try:
+                            await asyncio.wait_for(
+                                phase_changed.wait(),
+                                timeout=grid[0] - time.time() if grid else None)
+                        except asyncio.TimeoutError:
+                            pass
+                else:
+                    # Diamond Ring / Bailey's Beads: as fast as the camera allows
+                    await click(phase)
+            except Exception as e:
+                say('Encountered exception!')
+                print(e, file=sys.stderr)
+
+    async def countdown(target: float, text):
+        """Announce the approach of POSIX time `target` at 10-second granularity
+
+        The whole announcement schedule is planned up front as absolute
+        timestamps; each entry is slept to and popped exactly once.
+        """
+        announce_q = collections.deque((target - k, k) for k in range(50, 0, -10))
+        while announce_q:
+            when, k = announce_q.popleft()
+            delay = when - time.time()
+            if delay < 0:
+                continue # Already in the past (e.g. started mid-eclipse)
+            await asyncio.sleep(delay)
+            say(text.format(k))
+
+    async def progress():
+        """Track the long stretches cheaply; only totality gets a live bar
+
+        A tqdm bar over the multi-hour wait to C1 or a two-hour partial
+        phase wakes the interpreter every second to repaint an ETA nobody
+        is watching; on a battery-powered field rig those wakeups are pure
+        waste. The slow stretches instead print one countdown line per
+        minute and sleep minute-to-minute. Totality is short and fast-
+        moving, so it keeps the per-second bar.
+        """
+        segments = (
+            (None, C1_ts, '(Waiting) C1', False),
+            (C1_ts, C2_DR_ts, '(Partial) C2 DR', False),
+            (C2_BB2_ts, C3_BB2_ts, '(Total) C3', True),
+            (C3_DR_ts, C4_ts, '(Partial) C4', False),
+        )
+        for start, end, desc, fast in segments:
+            if time.time() >= end:
+                continue
+            if not fast:
+                while time.time() < end and not finished.is_set():
+                    remaining = end - time.time()
+                    if start is None or time.time() >= start:
+                        minutes, seconds = divmod(int(remaining), 60)
+                        echo(f'T-{minutes:03d}:{seconds:02d} until {desc}')
+                    # Wake only at (roughly) whole minutes of remaining time
+                    await asyncio.sleep(min(60.0, max(remaining % 60 or 60, 1.0)))
+                continue
+            # A disabled bar is a safe no-op stand-in until the segment opens,
+            # so no None checks (or swallowed AttributeErrors) are needed
+            pbar = tqdm.tqdm(disable=True)
+            opened = 0.0
+            while time.time() < end and not finished.is_set():
+                if time.time() >= start:
+                    if pbar.disable:
+                        UI_QUEUE.put_nowait(('close', pbar))
+                        opened = time.time()
+                        pbar = tqdm.tqdm(total=int(end - opened), desc=desc,
+                                         mininterval=1.0, ascii=True, leave=False)
+                    # Set n from elapsed wall time and repaint at most once a
+                    # second, instead of running tqdm's rate/ETA machinery on
+                    # every wakeup
+                    elapsed = int(time.time() - opened)
+                    if elapsed > pbar.n:
+                        pbar.n = min(elapsed, pbar.total)
+                        UI_QUEUE.put_nowait(('refresh', pbar))
+                await asyncio.sleep(1)
+            UI_QUEUE.put_nowait(('close', pbar))
+
+    # Enter whichever phase is already in progress if starting mid-eclipse
+    active = phase_at(time.time())
+    if active is not None:
+        set_phase(active)
+
+    tasks = [asyncio.create_task(coro) for coro in (
+        capture_loop(),
+        countdown(C2_DR_ts, 'Prepare camera for filter off in {} seconds'),
+        progress(),
+    )]
+    await finished.wait()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # Deliver the final "fourth contact over" announcement before returning
+    # tears down the daemon worker with the process
+    flush_ui()